@@ -10,19 +10,30 @@ Routes:
                    processing weather requests.
 
 Attributes:
+    DEBUG (bool): Whether the app runs in debug mode, enabled by setting FLASK_ENV to
+                  'development'. Outside debug mode templates are compiled once and
+                  never reloaded.
     app (Flask): The Flask application instance.
 
 Requirements:
+    - os: For reading FLASK_ENV at startup.
     - flask: For loading the Flask web application.
     - render_template: For rendering the HTML page.
     - request: For making HTTP requests.
     - weather: For calling the weather app.
 """
 
+import os
+
 from flask import Flask, render_template, request
 from weather import main as get_weather
 
+DEBUG = os.getenv('FLASK_ENV') == 'development'
+
 app = Flask(__name__)
+app.config['TEMPLATES_AUTO_RELOAD'] = DEBUG
+# Compile the template at startup so the first request does not pay for it.
+app.jinja_env.get_template('index.html')
 
 @app.route('/', methods=['GET', 'POST'])
 def index():
@@ -32,21 +43,25 @@ def index():
     This function processes both GET and POST requests. On POST requests, it retrieves
     the city and country names from the form data, fetches weather information using
     the get_weather function, and passes the data to the template for rendering.
+    Inputs are trimmed, and empty or implausibly long names are rejected without
+    calling the weather API.
 
     Returns:
         - str: Rendered HTML template with weather data if available, or None if GET request.
 
     Form Parameters:
-        - cityName (str): The name of the city to fetch weather data for.
-        - countryName (str): The name of the country where the city is located.
+        - cityName (str): The name of the city to fetch weather data for (1-60 characters).
+        - countryName (str): The name or code of the country where the city is located
+        (2-56 characters).
     """
 
     data = None
     if request.method == 'POST':
-        city = request.form['cityName']
-        country = request.form['countryName']
-        data = get_weather(city, country)
+        city = request.form.get('cityName', '').strip()
+        country = request.form.get('countryName', '').strip().upper()
+        if 1 <= len(city) <= 60 and 2 <= len(country) <= 56:
+            data = get_weather(city, country)
     return render_template('index.html', data=data)
 
 if __name__ == '__main__':
-    app.run(debug=True)
+    app.run(debug=DEBUG, threaded=True)
@@ -0,0 +1,18 @@
+"""
+Gunicorn configuration for the weather application.
+
+Requests spend nearly all their time waiting on the OpenWeatherMap API, so each
+worker runs gevent greenlets to serve many users concurrently.
+
+Example:
+    gunicorn -c gunicorn.conf.py
+"""
+
+import multiprocessing
+import os
+
+wsgi_app = "wsgi:app"
+bind = os.getenv("BIND", "0.0.0.0:8000")
+worker_class = "gevent"
+workers = multiprocessing.cpu_count() * 2 + 1
+worker_connections = 1000
@@ -0,0 +1,54 @@
+"""
+Unit tests for the Flask application.
+
+This module verifies that the form handler normalizes the city and country inputs
+and rejects invalid ones before any weather lookup is made. It uses monkeypatching
+to replace get_weather so no API calls are made.
+
+Tests:
+    test_index_rejects_invalid_input: Verifies that blank, overlong or missing form
+                      fields never reach get_weather.
+    test_index_normalizes_input: Verifies that the city is trimmed and the country
+                      is trimmed and upper-cased before calling get_weather.
+"""
+
+import pytest
+
+import app
+
+
+@pytest.fixture
+def lookups(monkeypatch):
+    """Record get_weather calls made by the index route."""
+
+    calls = []
+    monkeypatch.setattr(app, "get_weather", lambda city, country: calls.append((city, country)))
+    return calls
+
+
+@pytest.mark.parametrize(
+    "form",
+    [
+        {"cityName": "   ", "countryName": "PT"},
+        {"cityName": "P" * 61, "countryName": "PT"},
+        {"countryName": "PT"},
+        {"cityName": "Porto"},
+    ],
+    ids=["blank-city", "long-city", "missing-city", "missing-country"],
+)
+def test_index_rejects_invalid_input(lookups, form):
+    """Ensure invalid form input is rejected without a weather lookup."""
+
+    response = app.app.test_client().post("/", data=form)
+
+    assert response.status_code == 200
+    assert not lookups
+
+
+def test_index_normalizes_input(lookups):
+    """Ensure city and country are normalized before the weather lookup."""
+
+    response = app.app.test_client().post("/", data={"cityName": " Porto ", "countryName": " pt "})
+
+    assert response.status_code == 200
+    assert lookups == [("Porto", "PT")]
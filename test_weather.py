@@ -6,26 +6,94 @@ without making actual API calls. It uses monkeypatching to mock external depende
 and ensure that weather data retrieval works correctly.
 
 Tests:
-    test_get_weather: Verifies that weather.main() correctly integrates the
-                      get_lat_lon and get_current_weather functions and returns
-                      a properly structured WeatherData object.
+    test_get_weather: Verifies that weather.main() fetches the weather with a single
+                      get_weather_by_name call, skipping the get_lat_lon and
+                      get_current_weather round trips, and returns a properly
+                      structured WeatherData object.
+    test_main_caches_by_location: Verifies that repeated lookups for the same
+                      location are served from the cache.
+    test_main_falls_back_to_stale_cache: Verifies that an expired cache entry is
+                      returned when the API call fails.
+    test_main_shares_inflight_lookup: Verifies that concurrent lookups for the same
+                      location share a single API call.
+    test_main_inflight_leader_dies: Verifies that waiting lookups are released with a
+                      RuntimeError when the shared API call is interrupted.
+    test_main_rechecks_cache_before_leading: Verifies that a lookup racing with a
+                      finishing leader reuses its result instead of calling the API.
+    test_get_weather_by_name_unknown_location: Verifies that a 404 from the API is
+                      reported as None instead of an error.
+    test_main_caches_unknown_location: Verifies that unknown locations are cached
+                      for longer than regular results.
+    test_main_unknown_locations_do_not_evict_results: Verifies that many lookups for
+                      unknown locations do not flush cached weather results.
+    test_get_lat_lon_geocoding: Verifies that cities are resolved through the
+                      geocoding endpoint, and unknown ones yield (None, None).
+    test_get_session_created_once: Verifies that concurrent first lookups share a
+                      single HTTP session.
+    test_import_is_lazy: Verifies that importing the weather module does not import
+                      requests or load the API key.
+    test_get_current_weather_parses_response: Verifies that a current weather response
+                      is converted into WeatherData.
+    test_session_revalidates_expired_responses: Verifies that expired cached responses
+                      are revalidated with If-None-Match and reused on a 304.
+    test_session_purges_expired_responses: Verifies that expired responses are
+                      periodically purged from the SQLite cache.
 """
 
+import io
+import os
+import subprocess
+import sys
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3 import HTTPResponse
+
 import weather
 from weather import WeatherData
 
 
+class ETagAdapter(HTTPAdapter):
+    """Serve a response with an ETag, answering 304 when it is presented back."""
+
+    def __init__(self):
+        super().__init__()
+        self.sent = []
+
+    def send(self, request, **kwargs):  # pylint: disable=arguments-differ
+        self.sent.append(request.headers.get("If-None-Match"))
+        not_modified = request.headers.get("If-None-Match") == '"v1"'
+        raw = HTTPResponse(
+            body=io.BytesIO(b"" if not_modified else b'{"cod": 200}'),
+            headers={"ETag": '"v1"', "Content-Type": "application/json"},
+            status=304 if not_modified else 200,
+            preload_content=False,
+            request_url=request.url,
+        )
+        return self.build_response(request, raw)
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Start every test with an empty weather cache."""
+
+    weather._cache.clear()
+    weather._negative_cache.clear()
+    yield
+    weather._cache.clear()
+    weather._negative_cache.clear()
+
+
 def test_get_weather(monkeypatch):
     """Ensure weather.main returns WeatherData without hitting real APIs."""
 
-    def fake_get_lat_lon(city_name, country_name, apikey):
-        assert city_name == "Toronto"
-        assert country_name == "CA"
-        return 43.7, -79.4
-
-    def fake_get_current_weather(lat, lon, apikey):
-        assert lat == 43.7
-        assert lon == -79.4
+    def fake_get_weather_by_name(city_name, country_name, apikey):
+        assert city_name == "toronto"
+        assert country_name == "ca"
         return WeatherData(
             main="Clouds",
             description="overcast clouds",
@@ -33,8 +101,12 @@ def test_get_weather(monkeypatch):
             temp=12,
         )
 
-    monkeypatch.setattr(weather, "get_lat_lon", fake_get_lat_lon)
-    monkeypatch.setattr(weather, "get_current_weather", fake_get_current_weather)
+    def fail(*args):
+        raise AssertionError("main() should not make a second API call")
+
+    monkeypatch.setattr(weather, "get_weather_by_name", fake_get_weather_by_name)
+    monkeypatch.setattr(weather, "get_lat_lon", fail)
+    monkeypatch.setattr(weather, "get_current_weather", fail)
 
     result = weather.main("Toronto", "CA")
 
@@ -43,3 +115,313 @@ def test_get_weather(monkeypatch):
     assert result.description == "overcast clouds"
     assert result.icon == "04d"
     assert result.temp == 12
+
+
+def test_main_caches_by_location(monkeypatch):
+    """Ensure a repeated lookup for the same location makes a single API call."""
+
+    calls = []
+
+    def fake_get_weather_by_name(city_name, country_name, apikey):
+        calls.append((city_name, country_name))
+        return WeatherData(main="Clear", description="clear sky", icon="01d", temp=20)
+
+    monkeypatch.setattr(weather, "get_weather_by_name", fake_get_weather_by_name)
+
+    first = weather.main("London", "UK")
+    second = weather.main("london", "uk")
+    third = weather.main("  London ", "UK ")
+
+    assert first is second is third
+    assert calls == [("london", "uk")]
+
+
+def test_main_falls_back_to_stale_cache(monkeypatch):
+    """Ensure an expired result is served when the API call fails."""
+
+    stale = WeatherData(main="Rain", description="light rain", icon="10d", temp=8)
+    weather._cache[("paris", "fr")] = (0, stale)
+
+    def failing_get_weather_by_name(city_name, country_name, apikey):
+        raise requests.exceptions.ConnectionError("API unreachable")
+
+    monkeypatch.setattr(weather, "get_weather_by_name", failing_get_weather_by_name)
+
+    assert weather.main("Paris", "FR") is stale
+
+
+def test_main_shares_inflight_lookup(monkeypatch):
+    """Ensure concurrent lookups for one location wait on a single API call."""
+
+    calls = []
+    release = threading.Event()
+
+    def slow_get_weather_by_name(city_name, country_name, apikey):
+        calls.append((city_name, country_name))
+        release.wait(timeout=5)
+        return WeatherData(main="Snow", description="light snow", icon="13d", temp=-3)
+
+    monkeypatch.setattr(weather, "get_weather_by_name", slow_get_weather_by_name)
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(weather.main("Oslo", "NO")))
+        for _ in range(5)
+    ]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.1)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert len(results) == 5
+    assert all(result is results[0] for result in results)
+    assert not weather._inflight
+
+
+def test_main_inflight_leader_dies(monkeypatch):
+    """Ensure followers are released when the leader is killed mid-call."""
+
+    class Killed(BaseException):
+        """Stands in for gevent's GreenletExit or Timeout."""
+
+    entered = threading.Event()
+    release = threading.Event()
+
+    def killed_get_weather_by_name(city_name, country_name, apikey):
+        entered.set()
+        release.wait(timeout=5)
+        raise Killed()
+
+    monkeypatch.setattr(weather, "get_weather_by_name", killed_get_weather_by_name)
+
+    errors = []
+
+    def lookup():
+        try:
+            weather.main("Lima", "PE")
+        except (Killed, RuntimeError) as exc:
+            errors.append(exc)
+
+    leader = threading.Thread(target=lookup)
+    leader.start()
+    assert entered.wait(timeout=5)
+    follower = threading.Thread(target=lookup)
+    follower.start()
+    time.sleep(0.1)
+    release.set()
+    leader.join(timeout=5)
+    follower.join(timeout=5)
+
+    assert not follower.is_alive()
+    assert len(errors) == 2
+    leader_error, follower_error = errors
+    assert isinstance(leader_error, Killed)
+    assert isinstance(follower_error, RuntimeError)
+    assert follower_error.__cause__ is leader_error
+    assert not weather._inflight
+
+
+def test_main_rechecks_cache_before_leading(monkeypatch):
+    """Ensure a lookup racing with a finishing leader uses its cached result."""
+
+    cached = WeatherData(main="Mist", description="mist", icon="50d", temp=11)
+    inflight_lock = weather._inflight_lock
+
+    class LeaderFinishesLock:
+        """Caches a result just before the lock is taken, like a leader finishing."""
+
+        def __enter__(self):
+            weather._cache[("quito", "ec")] = (time.monotonic() + 60, cached)
+            return inflight_lock.__enter__()
+
+        def __exit__(self, *exc_info):
+            return inflight_lock.__exit__(*exc_info)
+
+    def fail(*args):
+        raise AssertionError("main() should not make a second API call")
+
+    monkeypatch.setattr(weather, "_inflight_lock", LeaderFinishesLock())
+    monkeypatch.setattr(weather, "get_weather_by_name", fail)
+
+    assert weather.main("Quito", "EC") is cached
+    assert not weather._inflight
+
+
+def test_get_weather_by_name_unknown_location(monkeypatch):
+    """Ensure a 'city not found' response yields None."""
+
+    response = requests.Response()
+    response.status_code = 404
+    response._content = b'{"cod": "404", "message": "city not found"}'
+    monkeypatch.setattr(
+        weather, "_get_session", lambda: SimpleNamespace(get=lambda *args, **kwargs: response)
+    )
+
+    assert weather.get_weather_by_name("Atlantis", "GR", "key") is None
+
+
+def test_main_caches_unknown_location(monkeypatch):
+    """Ensure a lookup for an unknown location is not repeated."""
+
+    calls = []
+
+    def fake_get_weather_by_name(city_name, country_name, apikey):
+        calls.append((city_name, country_name))
+
+    monkeypatch.setattr(weather, "get_weather_by_name", fake_get_weather_by_name)
+
+    assert weather.main("Lodnon", "UK") is None
+    assert weather.main("Lodnon", "UK") is None
+    assert calls == [("lodnon", "uk")]
+
+    expires_at, _ = weather._negative_cache[("lodnon", "uk")]
+    assert expires_at > time.monotonic() + weather._CACHE_TTL
+
+
+def test_main_unknown_locations_do_not_evict_results(monkeypatch):
+    """Ensure a flood of unknown locations leaves cached results in place."""
+
+    calls = []
+    known = WeatherData(main="Clear", description="clear sky", icon="01d", temp=25)
+
+    def fake_get_weather_by_name(city_name, country_name, apikey):
+        calls.append((city_name, country_name))
+        return known if city_name == "lisbon" else None
+
+    monkeypatch.setattr(weather, "get_weather_by_name", fake_get_weather_by_name)
+
+    assert weather.main("Lisbon", "PT") is known
+    for i in range(weather._CACHE_MAXSIZE + 1):
+        assert weather.main(f"Lisbno{i}", "PT") is None
+
+    calls.clear()
+    assert weather.main("Lisbon", "PT") is known
+    assert not calls
+    assert len(weather._negative_cache) == weather._NEGATIVE_CACHE_MAXSIZE
+
+
+def test_get_lat_lon_geocoding(monkeypatch):
+    """Ensure coordinates are looked up through the geocoding endpoint."""
+
+    requested = []
+
+    def fake_get(url, params, timeout):
+        requested.append((url, params))
+        response = requests.Response()
+        response.status_code = 200
+        if params["q"] == "Porto,PT":
+            response._content = b'[{"name": "Porto", "lat": 41.1496, "lon": -8.611, "country": "PT"}]'
+        else:
+            response._content = b"[]"
+        return response
+
+    monkeypatch.setattr(weather, "_get_session", lambda: SimpleNamespace(get=fake_get))
+
+    assert weather.get_lat_lon("Porto", "PT", "key") == (41.1496, -8.611)
+    assert weather.get_lat_lon("Atlantis", "GR", "key") == (None, None)
+    assert requested[0] == (
+        weather._GEO_URL,
+        {"q": "Porto,PT", "limit": 1, "appid": "key"},
+    )
+
+
+def test_get_session_created_once(monkeypatch, tmp_path):
+    """Ensure concurrent first lookups create a single HTTP session."""
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(weather, "_session", None)
+
+    sessions = []
+    start = threading.Barrier(8)
+
+    def first_lookup():
+        start.wait()
+        sessions.append(weather._get_session())
+
+    threads = [threading.Thread(target=first_lookup) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    try:
+        assert len(sessions) == 8
+        assert all(session is sessions[0] for session in sessions)
+    finally:
+        sessions[0].close()
+
+def test_import_is_lazy():
+    """Ensure the HTTP stack and .env file are only loaded on first use."""
+
+    code = (
+        "import sys, weather; "
+        "assert 'requests' not in sys.modules; "
+        "assert 'dotenv' not in sys.modules"
+    )
+    module_dir = os.path.dirname(os.path.abspath(weather.__file__))
+    subprocess.run([sys.executable, "-c", code], check=True, cwd=module_dir)
+
+
+def test_get_current_weather_parses_response(monkeypatch):
+    """Ensure the API response fields map onto WeatherData."""
+
+    response = requests.Response()
+    response.status_code = 200
+    response._content = (
+        b'{"weather": [{"id": 800, "main": "Clear", "description": "clear sky", "icon": "01n"}],'
+        b' "main": {"temp": 21.7, "humidity": 40}}'
+    )
+    monkeypatch.setattr(
+        weather, "_get_session", lambda: SimpleNamespace(get=lambda *args, **kwargs: response)
+    )
+
+    assert weather.get_current_weather(41.15, -8.61, "key") == WeatherData(
+        main="Clear", description="clear sky", icon="01n", temp=21
+    )
+
+
+def test_session_revalidates_expired_responses(monkeypatch, tmp_path):
+    """Ensure an expired cached response is revalidated instead of re-downloaded."""
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(weather, "_session", None)
+    session = weather._get_session()
+    try:
+        adapter = ETagAdapter()
+        session.mount("https://", adapter)
+        params = {"q": "porto,pt", "appid": "key"}
+
+        session.get(weather._WEATHER_URL, params=params, timeout=weather._TIMEOUT)
+        session.cache.reset_expiration(0)
+        response = session.get(weather._WEATHER_URL, params=params, timeout=weather._TIMEOUT)
+
+        assert adapter.sent == [None, '"v1"']
+        assert response.status_code == 200
+        assert response.content == b'{"cod": 200}'
+    finally:
+        session.close()
+
+
+def test_session_purges_expired_responses(monkeypatch, tmp_path):
+    """Ensure expired responses are periodically removed from the SQLite cache."""
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(weather, "_session", None)
+    session = weather._get_session()
+    try:
+        session.mount("https://", ETagAdapter())
+        params = {"q": "porto,pt", "appid": "key"}
+        session.get(weather._WEATHER_URL, params=params, timeout=weather._TIMEOUT)
+        session.cache.reset_expiration(0)
+
+        assert weather._get_session() is session
+        assert len(session.cache.responses) == 1
+
+        monkeypatch.setattr(weather, "_next_disk_purge", 0.0)
+        assert weather._get_session() is session
+        assert len(session.cache.responses) == 0
+    finally:
+        session.close()
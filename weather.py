@@ -2,8 +2,8 @@
 Weather Application Module
 
 This module provides functionality to fetch weather data for a specified city and country
-using the OpenWeatherMap API. It retrieves geographical coordinates and current weather
-information, returning structured weather data.
+using the OpenWeatherMap API. The current weather endpoint accepts a city query directly,
+so a single request returns the current conditions, returning structured weather data.
 
 The module uses environment variables to securely store the API key and implements
 dataclasses for clean data representation.
@@ -12,17 +12,28 @@ Functions:
     - get_lat_lon(city_name, country_name, apikey): Retrieves latitude and longitude coordinates
     for a given city and country.
     - get_current_weather(lat, lon, apikey): Fetches current weather data for specified coordinates.
-    - main(city_name, country_name): Orchestrates the weather data retrieval process.
+    - get_weather_by_name(city_name, country_name, apikey): Fetches current weather data for a
+    given city and country in a single request.
+    - main(city_name, country_name): Orchestrates the weather data retrieval process,
+    caching results per location for a few minutes.
 
 Classes:
-    - WeatherData: A dataclass that stores weather information including main condition,
+    - WeatherData: A frozen, slotted dataclass that stores weather information including main condition,
     description, icon code, and temperature.
 
 Requirements:
     - os: For grabbing the environment variable at runtime.
+    - threading, time, concurrent.futures: For the in-process weather cache and for
+    sharing in-flight lookups between concurrent requests.
     - dataclasses: For combine weather information into a dataclass.
-    - requests: For making HTTP requests to the OpenWeatherMap API.
+    - requests: For making HTTP requests to the OpenWeatherMap API over a shared,
+    connection-pooling session.
+    - brotli: Lets requests advertise and decode brotli-compressed API responses.
+    - requests-cache: For persisting API responses in a SQLite cache across restarts.
+    - orjson: For decoding API responses straight from the raw response bytes.
     - python-dotenv: For loading environment variables from .env file.
+    - functools: For reading the API key lazily, on first use rather than at
+    import time.
     - API_KEY: OpenWeatherMap API key stored in environment variables.
     It is stored in the .env file.
 
@@ -31,20 +42,114 @@ Example:
     print(f"{weather.description}, {weather.temp}°C")
 """
 
+import functools
 import os
+import threading
+import time
+from concurrent.futures import Future
 from dataclasses import dataclass
-import requests
-from dotenv import load_dotenv
-
-load_dotenv()
-api_key = os.getenv("API_KEY")
-
+import orjson
+
+_WEATHER_URL = "https://api.openweathermap.org/data/2.5/weather"
+_GEO_URL = "https://api.openweathermap.org/geo/1.0/direct"
+
+# (connect, read) timeouts in seconds: an unreachable API fails fast instead of
+# holding the Flask worker for the full read timeout.
+_TIMEOUT = (3.05, 10)
+
+# Weather results are shared between users for a few minutes, keyed by location.
+# Each entry is (expires_at, WeatherData); expired entries stay until evicted so
+# they can be served as a fallback when the API is unavailable.
+_CACHE_TTL = 300
+_CACHE_MAXSIZE = 1024
+_cache = {}
+# Unknown locations are cached longer, since a typo will not start resolving by
+# itself, and in their own smaller map so junk lookups cannot evict real results.
+_NEGATIVE_CACHE_TTL = 3600
+_NEGATIVE_CACHE_MAXSIZE = 256
+_negative_cache = {}
+_cache_lock = threading.Lock()
+
+# Lookups currently waiting on the API, keyed like the cache, so concurrent
+# requests for the same location share one outbound call.
+_inflight = {}
+_inflight_lock = threading.Lock()
+# Upper bound on how long a follower waits for the leader's API call; a little
+# longer than the connect and read timeouts combined.
+_INFLIGHT_TIMEOUT = 15
+
+# Shared HTTP session, created on first use by _get_session.
+_session = None
+_session_lock = threading.Lock()
+# Expired rows stay in the SQLite cache for ETag revalidation; they are purged
+# hourly so the file does not grow without bound.
+_DISK_PURGE_INTERVAL = 3600
+_next_disk_purge = 0.0
+
+
+@functools.lru_cache(maxsize=1)
+def _get_api_key():
+    """Load the API key from the environment (and .env file) on first use."""
+
+    from dotenv import load_dotenv  # pylint: disable=import-outside-toplevel
+
+    load_dotenv()
+    return os.getenv("API_KEY")
+
+
+def _get_session():
+    """
+    Create the shared HTTP session on first use.
+
+    Importing requests and opening the SQLite cache is deferred until a lookup
+    actually needs the network, which keeps app startup and test collection fast.
+    The session reuses the TCP/TLS connection to the API, and keeps responses in a
+    SQLite cache for _CACHE_TTL seconds so they survive restarts; the API key is
+    left out of the stored requests and cache keys. Expired responses that carry an
+    ETag or Last-Modified header are revalidated with If-None-Match/If-Modified-Since,
+    so an unchanged response comes back as a bodiless 304 and is served from disk.
+    Creation is guarded by a lock so concurrent first lookups share one session.
+
+    The SQLite file is shared by every gunicorn worker, so it runs in WAL mode with
+    a short busy timeout: a worker waiting on another's write lock must not stall
+    all of its greenlets for sqlite3's default five seconds.
+    """
 
-@dataclass
+    global _session, _next_disk_purge  # pylint: disable=global-statement
+
+    with _session_lock:
+        if _session is None:
+            # pylint: disable=import-outside-toplevel
+            from requests.adapters import HTTPAdapter
+            from requests_cache import CachedSession
+
+            session = CachedSession(
+                "weather_cache",
+                backend="sqlite",
+                expire_after=_CACHE_TTL,
+                allowable_methods=["GET"],
+                ignored_parameters=["appid"],
+                wal=True,
+                busy_timeout=250,
+            )
+            session.mount("https://", HTTPAdapter(pool_connections=10, pool_maxsize=50))
+            _session = session
+
+        now = time.monotonic()
+        if now >= _next_disk_purge:
+            _next_disk_purge = now + _DISK_PURGE_INTERVAL
+            _session.cache.delete(expired=True)
+    return _session
+
+
+@dataclass(slots=True, frozen=True)
 class WeatherData:
     """
     A data class representing weather information.
 
+    Instances are immutable and use __slots__, since they are shared between
+    requests through the weather cache.
+
     Attributes:
         - main (str): The main weather condition category (e.g., 'Clear', 'Rain', 'Clouds').
         - description (str): A detailed description of the weather condition.
@@ -62,8 +167,9 @@ def get_lat_lon(city_name, country_name, apikey):
     """
     Retrieve the latitude and longitude coordinates for a specified city and country.
 
-    This function makes a request to the OpenWeatherMap API to fetch geographical
-    coordinates (latitude and longitude) for the given city and country combination.
+    This function makes a request to the OpenWeatherMap geocoding API to fetch
+    geographical coordinates (latitude and longitude) for the given city and country
+    combination.
 
     Args:
         - city_name (str): The name of the city to look up.
@@ -80,13 +186,15 @@ def get_lat_lon(city_name, country_name, apikey):
         print(f"Coordinates: {lat}, {lon}")
     """
 
-    response = requests.get(
-        f"https://api.openweathermap.org/data/2.5/weather?q={city_name},{country_name}&appid={apikey}",
-        timeout=10,
-    ).json()
-    coord = response.get("coord", {})
-    lat, lon = coord.get("lat"), coord.get("lon")
-    return lat, lon
+    response = _get_session().get(
+        _GEO_URL,
+        params={"q": f"{city_name},{country_name}", "limit": 1, "appid": apikey},
+        timeout=_TIMEOUT,
+    )
+    matches = orjson.loads(response.content)
+    if not isinstance(matches, list) or not matches:
+        return None, None
+    return matches[0].get("lat"), matches[0].get("lon")
 
 
 def get_current_weather(lat, lon, apikey):
@@ -110,15 +218,55 @@ def get_current_weather(lat, lon, apikey):
         - KeyError: If the expected data fields are not present in the API response.
     """
 
-    response = requests.get(
-        f"https://api.openweathermap.org/data/2.5/weather?lat={lat}&lon={lon}&appid={apikey}&units=metric",
-        timeout=10,
-    ).json()
+    response = _get_session().get(
+        _WEATHER_URL,
+        params={"lat": lat, "lon": lon, "appid": apikey, "units": "metric"},
+        timeout=_TIMEOUT,
+    )
+    return _to_weather_data(orjson.loads(response.content))
+
+
+def get_weather_by_name(city_name, country_name, apikey):
+    """
+    Retrieves current weather data for a city and country from OpenWeatherMap API.
+
+    The current weather endpoint resolves the city query itself, so this needs a single
+    request instead of a coordinates lookup followed by a weather lookup.
+
+    Args:
+        - city_name (str): The name of the city to look up.
+        - country_name (str): The name or code of the country where the city is located.
+        - apikey (str): OpenWeatherMap API key for authentication.
+
+    Returns:
+        - WeatherData or None: An object containing the current weather information, or
+        None if the API does not know the location.
+
+    Raises:
+        - requests.exceptions.RequestException: If the API request fails.
+        - KeyError: If the expected data fields are not present in the API response.
+    """
+
+    response = _get_session().get(
+        _WEATHER_URL,
+        params={"q": f"{city_name},{country_name}", "appid": apikey, "units": "metric"},
+        timeout=_TIMEOUT,
+    )
+    if response.status_code == 404:
+        return None
+    response.raise_for_status()
+    return _to_weather_data(orjson.loads(response.content))
+
+
+def _to_weather_data(response):
+    """Build a WeatherData object from a current weather API response."""
+
+    weather = response["weather"][0]
     data = WeatherData(
-        main=response.get("weather")[0].get("main"),
-        description=response.get("weather")[0].get("description"),
-        icon=response.get("weather")[0].get("icon"),
-        temp=int(response.get("main").get("temp")),
+        main=weather["main"],
+        description=weather["description"],
+        icon=weather["icon"],
+        temp=int(response["main"]["temp"]),
     )
     return data
 
@@ -127,26 +275,120 @@ def main(city_name, country_name):
     """
     Retrieve current weather data for a specified city and country.
 
-    This function takes a city name and country name as input, retrieves the
-    geographical coordinates (latitude and longitude) for that location, and
-    then fetches the current weather data for those coordinates.
+    This function takes a city name and country name as input and fetches the
+    current weather data for that location with a single API request. Results are
+    cached per location (ignoring case and surrounding whitespace) for _CACHE_TTL
+    seconds, or for _NEGATIVE_CACHE_TTL seconds when the location is unknown; if
+    the API call fails, the last known result for the location is returned when available.
+    Concurrent calls for the same location wait on a single API request.
 
     Args:
         - city_name (str): The name of the city for which to retrieve weather data.
         - country_name (str): The name of the country where the city is located.
 
     Returns:
-        - dict: A dictionary containing current weather data for the specified location.
-              - The exact structure depends on the API response from get_current_weather().
+        - WeatherData or None: The current weather data for the specified location, or
+        None if the location is not found.
 
     Raises:
-        - May raise exceptions from get_lat_lon() or get_current_weather() if the API
-        calls fail or if the location cannot be found.
+        - May raise exceptions from get_weather_by_name() if the API call fails or
+        if the location cannot be found.
+        - TimeoutError: If a concurrent lookup for the same location does not finish
+        within _INFLIGHT_TIMEOUT seconds.
+        - RuntimeError: If a concurrent lookup for the same location was interrupted.
 
     Note:
-        This function requires 'api_key' to be defined in the current scope.
+        This function requires the API_KEY environment variable (or .env entry).
     """
 
-    lat, lon = get_lat_lon(city_name, country_name, api_key)
-    weather_data = get_current_weather(lat, lon, api_key)
+    key = (city_name.strip().lower(), country_name.strip().lower())
+    hit, weather_data, entry = _cache_get(key)
+    if hit:
+        return weather_data
+
+    with _inflight_lock:
+        # Check again under the lock: a leader caches its result before leaving
+        # _inflight, so a lookup racing with it must not start a second API call.
+        hit, weather_data, entry = _cache_get(key)
+        if hit:
+            return weather_data
+        future = _inflight.get(key)
+        leader = future is None
+        if leader:
+            future = _inflight[key] = Future()
+    if not leader:
+        return future.result(timeout=_INFLIGHT_TIMEOUT)
+
+    try:
+        weather_data = _fetch_weather(key, entry)
+    except BaseException as exc:
+        # Always resolve the future so followers never wait on it forever, but do not
+        # hand them this caller's own interruption (KeyboardInterrupt, GreenletExit,
+        # gevent's Timeout) to re-raise.
+        if isinstance(exc, Exception):
+            future.set_exception(exc)
+        else:
+            error = RuntimeError("in-flight lookup aborted")
+            error.__cause__ = exc
+            future.set_exception(error)
+        raise
+    else:
+        future.set_result(weather_data)
+    finally:
+        with _inflight_lock:
+            del _inflight[key]
     return weather_data
+
+
+def _cache_get(key):
+    """
+    Look up a location in the weather caches.
+
+    Returns a (hit, value, entry) tuple, where entry is the possibly expired result
+    cache entry that can serve as a stale fallback.
+    """
+
+    now = time.monotonic()
+    with _cache_lock:
+        entry = _cache.get(key)
+        negative_entry = _negative_cache.get(key)
+    if entry is not None and entry[0] > now:
+        return True, entry[1], entry
+    if negative_entry is not None and negative_entry[0] > now:
+        return True, None, entry
+    return False, None, entry
+
+
+def _fetch_weather(key, stale_entry):
+    """
+    Fetch weather from the API and cache it, falling back to a stale entry on failure.
+
+    The query uses the normalized (lowercase) city and country from the cache key, so
+    the SQLite cache stores a single response per location however it was typed.
+    """
+
+    import requests  # pylint: disable=import-outside-toplevel
+
+    city_name, country_name = key
+    try:
+        weather_data = get_weather_by_name(city_name, country_name, _get_api_key())
+    except requests.exceptions.RequestException:
+        if stale_entry is not None:
+            return stale_entry[1]
+        raise
+
+    if weather_data is None:
+        _cache_set(_negative_cache, _NEGATIVE_CACHE_MAXSIZE, key, None, _NEGATIVE_CACHE_TTL)
+    else:
+        _cache_set(_cache, _CACHE_MAXSIZE, key, weather_data, _CACHE_TTL)
+    return weather_data
+
+
+def _cache_set(cache, maxsize, key, value, ttl):
+    """Store a value in a bounded cache, evicting the oldest entry when full."""
+
+    with _cache_lock:
+        cache.pop(key, None)
+        if len(cache) >= maxsize:
+            del cache[next(iter(cache))]
+        cache[key] = (time.monotonic() + ttl, value)
@@ -0,0 +1,26 @@
+"""
+WSGI entry point for running the weather application in production.
+
+This module patches the standard library with gevent before the Flask app is
+imported, so that `requests`, loaded later on the first weather lookup, makes
+socket calls to the OpenWeatherMap API that yield to other greenlets instead of
+stalling the worker.
+
+Attributes:
+    app (Flask): The Flask application instance, served by gunicorn.
+
+Requirements:
+    - gevent: For cooperative, greenlet-based concurrency.
+    - app: For the Flask application instance.
+
+Example:
+    gunicorn -c gunicorn.conf.py
+"""
+
+from gevent import monkey
+
+monkey.patch_all()
+
+from app import app  # noqa: E402  pylint: disable=wrong-import-position
+
+__all__ = ["app"]